@@ -1,6 +1,7 @@
 # ea2puml/ea_adapter.py
 from __future__ import annotations
-from typing import Dict, Optional
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, List, Optional
 
 try:
     import win32com.client  # type: ignore
@@ -11,10 +12,15 @@ from .config import Config
 from .models import Diagram, Element, Connector, Note, Geometry, ConnectorEnd
 from .utils import AliasFactory
 
+# lowercased EA element types that are also emitted as diagram notes
+_NOTE_TYPES = frozenset(("note", "text"))
+
 class EAAdapter:
     """EA COM adapter → neutral models. All pywin32 lives here."""
     def __init__(self, cfg: Config) -> None:
         self._repo = None
+        self._get_element = None
+        self._get_connector = None
         self._cfg = cfg
         self._alias_factory = AliasFactory(cfg.alias_mode or "human")
 
@@ -23,8 +29,16 @@ class EAAdapter:
             return
         if win32com is None:
             raise RuntimeError("pywin32 is required. Install with: pip install pywin32")
-        app = win32com.client.Dispatch("EA.App")
+        try:
+            # early binding: makepy wrappers from EA's type library (generated on first run)
+            app = win32com.client.gencache.EnsureDispatch("EA.App")
+        except Exception:
+            # type library unavailable (or gen_py cache not writable) -> late binding
+            app = win32com.client.Dispatch("EA.App")
         self._repo = app.Repository
+        # resolve the per-object lookups once instead of on every call
+        self._get_element = self._repo.GetElementByID
+        self._get_connector = self._repo.GetConnectorByID
 
     def get_selected_diagram(self) -> Diagram:
         self._ensure_repo()
@@ -35,81 +49,208 @@ class EAAdapter:
 
         diagram = Diagram(id=dia.DiagramID, name=dia.Name, type=dia.Type)
 
+        # Bulk-load element/connector fields with one SQL round-trip each; rows
+        # missing from the result (or all of them, if SQLQuery is unavailable)
+        # are fetched per object over COM and memoized in the same dict.
+        d_objs = list(dia.DiagramObjects)
+        el_ids = [d_obj.ElementID for d_obj in d_objs]
+        rows = self._bulk_fetch(el_ids) or {}
+
+        # bind per-iteration callables/flags once (LOAD_FAST in the hot loop)
+        el_append = diagram.elements.append
+        notes_append = diagram.notes.append
+        conn_append = diagram.connectors.append
+        make_alias = self._alias_factory.make
+        parse_geometry = self._parse_geometry
+        keep_alias = self._cfg.alias_mode != "name"
+
         elements_by_id: Dict[int, Element] = {}
-        for d_obj in dia.DiagramObjects:
-            el = repo.GetElementByID(d_obj.ElementID)
+        for d_obj, el_id in zip(d_objs, el_ids):
+            row = rows.get(el_id)
+            if row is None:
+                row = rows[el_id] = self._fetch_element(el_id)
+            name = row["name"]
+            el_type = row["type"]
             inst_guid = d_obj.InstanceGUID
-            alias = self._alias_factory.make(inst_guid, el.Name or "")
+            alias = make_alias(inst_guid, name)
 
-            geom = self._parse_geometry(d_obj)
+            geom = parse_geometry(d_obj)
+            tags = row["tags"]
             elem = Element(
-                id=el.ElementID,
+                id=el_id,
                 guid=str(inst_guid),
-                name=el.Name or "",
-                type=el.Type or "",
-                stereotype=getattr(el, "Stereotype", None) or None,
+                name=name,
+                type=el_type,
+                stereotype=row["stereotype"],
                 color=None,  # fill if your monolith emitted background color from d_obj
-                tags=self._collect_tags(el),
+                tags=tags,
                 geometry=geom,
-                alias=alias if (self._cfg.alias_mode != "name") else "",  # name-mode uses quoted names
+                alias=alias if keep_alias else "",  # name-mode uses quoted names
             )
             elements_by_id[elem.id] = elem
-            diagram.elements.append(elem)
-
-            # Notes as elements? keep here or in a separate pass if needed
+            el_append(elem)
 
-        # Notes (optional): if your monolith treated notes specially, mirror it
-        for d_obj in dia.DiagramObjects:
-            el = repo.GetElementByID(d_obj.ElementID)
-            if (el.Type or "").lower() in ("note", "text"):
-                geom = self._parse_geometry(d_obj)
-                diagram.notes.append(
+            # Notes: collected in the same pass, reusing geometry and tags. They
+            # stay in diagram.elements too, as in the monolith (note elements).
+            if el_type.lower() in _NOTE_TYPES:
+                notes_append(
                     Note(
-                        id=el.ElementID,
-                        text=el.Notes or el.Name or "",
+                        id=elem.id,
+                        text=row["notes"] or name,
                         geometry=geom,
-                        tags=self._collect_tags(el),
+                        tags=tags,
                     )
                 )
 
-        for d_link in dia.DiagramLinks:
-            conn = repo.GetConnectorByID(d_link.ConnectorID)
+        d_links = list(dia.DiagramLinks)
+        conn_ids = [d_link.ConnectorID for d_link in d_links]
+        conn_rows = self._bulk_fetch_connectors(conn_ids) or {}
+        for d_link, conn_id in zip(d_links, conn_ids):
+            row = conn_rows.get(conn_id)
+            if row is None:
+                row = conn_rows[conn_id] = self._fetch_connector(conn_id)
             c = Connector(
-                id=conn.ConnectorID,
-                type=conn.Type or "",
-                stereotype=getattr(conn, "Stereotype", None) or None,
+                id=conn_id,
+                type=row["type"],
+                stereotype=row["stereotype"],
                 color=None,  # fill if your monolith emitted connector color
-                source=ConnectorEnd(element_id=int(conn.ClientID)),
-                target=ConnectorEnd(element_id=int(conn.SupplierID)),
-                labels={"name": getattr(conn, "Name", "") or ""},
+                source=ConnectorEnd(element_id=row["client_id"]),
+                target=ConnectorEnd(element_id=row["supplier_id"]),
+                name=row["name"],
                 geometry=self._parse_link_geometry(d_link),
             )
-            diagram.connectors.append(c)
+            conn_append(c)
 
         # Package membership (copy your exact algorithm here if needed)
         diagram.packages = {}
 
         return diagram
 
+    # ---------- bulk SQL loading ----------
+    def _sql_rows(self, sql: str) -> List[Dict[str, str]]:
+        """Run Repository.SQLQuery and parse its XML into {lowercased column: text} rows."""
+        root = ET.fromstring(self._repo.SQLQuery(sql))
+        return [{col.tag.lower(): col.text or "" for col in row} for row in root.iter("Row")]
+
+    @staticmethod
+    def _id_list(ids: Iterable[int]) -> str:
+        return ",".join(str(int(i)) for i in sorted(set(ids)))
+
+    @staticmethod
+    def _row_id(row: Dict[str, str], col: str) -> Optional[int]:
+        """Integer ID column of a SQL row, or None when missing/unparsable."""
+        try:
+            return int(row[col])
+        except (KeyError, ValueError):
+            return None
+
+    def _bulk_fetch(self, element_ids: List[int]) -> Optional[Dict[int, dict]]:
+        """Element fields + tagged values for `element_ids` in two SQLQuery calls.
+
+        Returns None if the repository cannot answer (no SQLQuery, SQL error,
+        unparsable result); callers then fall back to `_fetch_element`.
+        """
+        if not element_ids:
+            return {}
+        ids = self._id_list(element_ids)
+        try:
+            objects = self._sql_rows(
+                "SELECT Object_ID, Name, Object_Type, Stereotype, Note FROM t_object "
+                f"WHERE Object_ID IN ({ids})")
+            props = self._sql_rows(
+                "SELECT Object_ID, Property, Value, Notes FROM t_objectproperties "
+                f"WHERE Object_ID IN ({ids}) ORDER BY Object_ID, PropertyID")
+        except Exception:
+            return None
+
+        # malformed rows are skipped: their elements fall back to COM reads
+        row_id = self._row_id
+        rows: Dict[int, dict] = {}
+        for r in objects:
+            obj_id = row_id(r, "object_id")
+            if obj_id is None:
+                continue
+            rows[obj_id] = {
+                "name": r.get("name", ""),
+                "type": r.get("object_type", ""),
+                "stereotype": r.get("stereotype") or None,
+                "notes": r.get("note", ""),
+                "tags": {},
+            }
+        for r in props:
+            row = rows.get(row_id(r, "object_id"))
+            name = r.get("property")
+            if row is not None and name:
+                row["tags"][name] = r.get("value") or r.get("notes") or ""
+        return rows
+
+    def _bulk_fetch_connectors(self, connector_ids: List[int]) -> Optional[Dict[int, dict]]:
+        """Connector fields for `connector_ids` in one SQLQuery call (None on failure)."""
+        if not connector_ids:
+            return {}
+        try:
+            conns = self._sql_rows(
+                "SELECT Connector_ID, Name, Connector_Type, Stereotype, Start_Object_ID, End_Object_ID "
+                f"FROM t_connector WHERE Connector_ID IN ({self._id_list(connector_ids)})")
+        except Exception:
+            return None
+        # malformed rows are skipped: their connectors fall back to COM reads
+        row_id = self._row_id
+        rows: Dict[int, dict] = {}
+        for r in conns:
+            conn_id = row_id(r, "connector_id")
+            client_id = row_id(r, "start_object_id")
+            supplier_id = row_id(r, "end_object_id")
+            if conn_id is None or client_id is None or supplier_id is None:
+                continue
+            rows[conn_id] = {
+                "name": r.get("name", ""),
+                "type": r.get("connector_type", ""),
+                "stereotype": r.get("stereotype") or None,
+                "client_id": client_id,
+                "supplier_id": supplier_id,
+            }
+        return rows
+
+    def _fetch_element(self, el_id: int) -> dict:
+        """Per-object COM fallback; same row shape as `_bulk_fetch`."""
+        el = self._get_element(el_id)
+        el_type = el.Type or ""
+        return {
+            "name": el.Name or "",
+            "type": el_type,
+            "stereotype": getattr(el, "Stereotype", None) or None,
+            "notes": (el.Notes or "") if el_type.lower() in _NOTE_TYPES else "",
+            "tags": self._collect_tags(el),
+        }
+
+    def _fetch_connector(self, conn_id: int) -> dict:
+        """Per-connector COM fallback; same row shape as `_bulk_fetch_connectors`."""
+        conn = self._get_connector(conn_id)
+        return {
+            "name": getattr(conn, "Name", "") or "",
+            "type": conn.Type or "",
+            "stereotype": getattr(conn, "Stereotype", None) or None,
+            "client_id": int(conn.ClientID),
+            "supplier_id": int(conn.SupplierID),
+        }
+
     # ---------- helpers ----------
     def _parse_geometry(self, d_obj) -> Geometry:
-        left = getattr(d_obj, "left", None) or getattr(d_obj, "Left", 0)
-        right = getattr(d_obj, "right", None) or getattr(d_obj, "Right", 0)
-        top = getattr(d_obj, "top", None) or getattr(d_obj, "Top", 0)
-        bottom = getattr(d_obj, "bottom", None) or getattr(d_obj, "Bottom", 0)
-        return Geometry(left=left, right=right, top=top, bottom=bottom)
+        # EA.DiagramObject exposes Capitalized properties only: one COM read per field
+        return Geometry(left=d_obj.Left, right=d_obj.Right, top=d_obj.Top, bottom=d_obj.Bottom)
 
     def _parse_link_geometry(self, d_link) -> Optional[Geometry]:
         return None
 
     def _collect_tags(self, el) -> Dict[str, str]:
+        tv_col = el.TaggedValues
+        if tv_col.Count == 0:  # the common case: no enumeration round-trips
+            return {}
         tags: Dict[str, str] = {}
-        try:
-            for tv in el.TaggedValues:
-                name = getattr(tv, "Name", None)
-                val = getattr(tv, "Value", None) or getattr(tv, "Notes", None)
-                if name:
-                    tags[str(name)] = "" if val is None else str(val)
-        except Exception:
-            pass
+        for tv in tv_col:
+            name = tv.Name
+            if name:
+                val = tv.Value or tv.Notes
+                tags[str(name)] = "" if val is None else str(val)
         return tags
@@ -1,26 +1,77 @@
 from __future__ import annotations
-from typing import Callable, Dict
+from importlib import import_module
+from types import MappingProxyType
+from typing import Callable, Dict, Iterator, Mapping
 
 # Handler protocol (duck-typed): class with
-#   render(diagram, out, cfg) -> None
+#   render(diagram, cfg) -> Iterable[str]   (output lines, no trailing newlines)
 
 _REGISTRY: Dict[str, type] = {}
+# Read-only live view used for lookups; it always reflects register() calls,
+# so there is no snapshot to rebuild.
+_VIEW: Mapping[str, type] = MappingProxyType(_REGISTRY)
+# diagram type -> module whose import registers its handler (see register_lazy)
+_LAZY: Dict[str, str] = {}
+
+
+def _normalize(diagram_type: str) -> str:
+    return (diagram_type or "").strip().lower()
 
 
 def register(ea_diagram_type: str) -> Callable[[type], type]:
     def deco(cls: type) -> type:
-        _REGISTRY[ea_diagram_type.strip().lower()] = cls
+        _REGISTRY[_normalize(ea_diagram_type)] = cls
         return cls
     return deco
 
 
+def register_lazy(ea_diagram_type: str, module: str) -> None:
+    """Defer importing `module` until `ea_diagram_type` is first resolved."""
+    _LAZY[_normalize(ea_diagram_type)] = module
+
+
 def resolve(diagram_type: str) -> type:
-    key = (diagram_type or "").strip().lower()
-    try:
-        return _REGISTRY[key]
-    except KeyError:
+    key = _normalize(diagram_type)
+    handler = _VIEW.get(key)
+    if handler is None and key in _LAZY:
+        # drop the lazy entry only once its import succeeded, so a failing
+        # import keeps raising its real error on every resolve()
+        import_module(_LAZY[key])
+        del _LAZY[key]
+        handler = _VIEW.get(key)
+    if handler is None:
         raise KeyError(f"No handler registered for diagram type: {diagram_type!r}")
+    return handler
+
+
+class _RegisteredTypes(Mapping[str, type]):
+    """Read-only live view over imported and lazily registered handlers.
+
+    Keys cover both registries; a lazy handler is imported on value access.
+    A lazy handler whose import fails reads as missing (KeyError, so `.get()`
+    returns its default); `resolve()` is what surfaces the real import error.
+    """
+    def __getitem__(self, diagram_type: str) -> type:
+        try:
+            return resolve(diagram_type)
+        except (KeyError, ImportError):
+            raise KeyError(diagram_type) from None
+
+    def __contains__(self, diagram_type: object) -> bool:
+        key = _normalize(diagram_type) if isinstance(diagram_type, str) else diagram_type
+        return key in _REGISTRY or key in _LAZY
+
+    def __iter__(self) -> Iterator[str]:
+        # snapshot: resolving a lazy entry mutates both registries
+        return iter([*_REGISTRY, *(k for k in _LAZY if k not in _REGISTRY)])
+
+    def __len__(self) -> int:
+        return len(_REGISTRY.keys() | _LAZY.keys())
+
+
+_REGISTERED_TYPES = _RegisteredTypes()
 
 
-def registered_types() -> Dict[str, type]:
-    return dict(_REGISTRY)
+def registered_types() -> Mapping[str, type]:
+    """Read-only view of every known diagram type (imported or lazily registered)."""
+    return _REGISTERED_TYPES
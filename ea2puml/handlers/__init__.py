@@ -1,2 +1,2 @@
-# Submodule marker – handlers are imported for side effects (registry).
-from . import component, sequence, usecase  # noqa: F401
+# Submodule marker – each handler module registers itself on import;
+# main.py wires them up lazily via handler_registry.register_lazy().
@@ -0,0 +1,22 @@
+from __future__ import annotations
+from typing import Dict, List
+
+from ..models import Connector, Diagram, Element
+from ..utils import puml_escape_inline
+
+# Helpers shared by the diagram handlers (one copy to keep in sync).
+
+def _index(diagram: Diagram) -> Dict[int, Element]:
+    return {e.id: e for e in diagram.elements}
+
+def _valid_connectors(diagram: Diagram, idx: Dict[int, Element]) -> List[Connector]:
+    """Connectors whose both endpoints are on the diagram (checked once per render)."""
+    return [c for c in diagram.connectors
+            if c.source.element_id in idx and c.target.element_id in idx]
+
+def _refs(idx: Dict[int, Element], alias_mode: str, conns: List[Connector]) -> Dict[int, str]:
+    """id -> reference token, only for elements `conns` reference; alias mode checked once."""
+    ids = {c.source.element_id for c in conns} | {c.target.element_id for c in conns}
+    if alias_mode == "name":
+        return {i: f"\"{puml_escape_inline(idx[i].name)}\"" for i in ids}
+    return {i: idx[i].alias or f"\"{puml_escape_inline(idx[i].name)}\"" for i in ids}
@@ -1,57 +1,62 @@
 from __future__ import annotations
-from typing import Dict
+from itertools import chain
+from typing import Iterable
 
 from ..handler_registry import register
-from ..models import Diagram, Element
-from ..renderer import PlantUMLWriter
+from ..models import Diagram
 from ..utils import puml_escape_inline
+from ._common import _index, _refs, _valid_connectors
 
-def _index(diagram: Diagram) -> Dict[int, Element]:
-    return {e.id: e for e in diagram.elements}
-
-def _ref(el: Element, alias_mode: str) -> str:
-    if alias_mode == "name":
-        return f"\"{puml_escape_inline(el.name)}\""
-    return el.alias or f"\"{puml_escape_inline(el.name)}\""
+# edge_labels policy -> (show connector name, show connector stereotype)
+_LABEL_PARTS = {
+    "name": (True, False),
+    "stereotype": (False, True),
+    "both": (True, True),
+}
 
 @register("Component")
 class ComponentDiagramHandler:
     @staticmethod
-    def render(diagram: Diagram, out: PlantUMLWriter, cfg) -> None:
-        if cfg.direction:
-            out.writeln(cfg.direction)
+    def render(diagram: Diagram, cfg) -> Iterable[str]:
+        # hoist config reads out of the per-element/per-connector loops
+        alias_mode = cfg.alias_mode
+        edge_labels = cfg.edge_labels
+        element_stereo = cfg.element_stereo
+        header = [cfg.direction] if cfg.direction else []
+
+        idx = _index(diagram)
+        conns = _valid_connectors(diagram, idx)
+        refs = _refs(idx, alias_mode, conns)
+        esc_names = {eid: puml_escape_inline(e.name) for eid, e in idx.items()}
 
         # Elements (simple version; keep your richer styles if you already ported them)
-        for el in diagram.elements:
-            stereo = f" <<{el.stereotype}>>" if (el.stereotype and cfg.element_stereo) else ""
-            color = ""  # fill when you port color logic
-            alias = f" as {el.alias}" if (el.alias and cfg.alias_mode != "name") else ""
-            out.writeln(f'component "{puml_escape_inline(el.name)}"{stereo}{alias}{color}')
+        # (color: fill when you port color logic)
+        show_el_stereo = bool(element_stereo)
+        as_alias = alias_mode != "name"
+        element_lines = (
+            f'component "{esc_names[el.id]}"'
+            + (f" <<{el.stereotype}>>" if (show_el_stereo and el.stereotype) else "")
+            + (f" as {el.alias}" if (as_alias and el.alias) else "")
+            for el in diagram.elements
+        )
 
         # Connectors
-        idx = _index(diagram)
-        for c in diagram.connectors:
-            src_el = idx.get(c.source.element_id)
-            dst_el = idx.get(c.target.element_id)
-            if not src_el or not dst_el:
-                continue
-            src = _ref(src_el, cfg.alias_mode)
-            dst = _ref(dst_el, cfg.alias_mode)
-
-            # label policy (simplified; extend to match your monolith exactly)
-            label = ""
-            parts = []
-            if cfg.edge_labels in ("name", "both"):
-                nm = c.labels.get("name")
-                if nm:
-                    parts.append(nm)
-            if cfg.edge_labels in ("stereotype", "both") and c.stereotype:
-                parts.append(f"<<{c.stereotype}>>")
-            if parts:
-                label = " : " + " / ".join(parts)
-
-            out.writeln(f"{src} --> {dst}{label}")
+        # label policy (simplified; extend to match your monolith exactly)
+        show_name, show_stereo = _LABEL_PARTS.get(edge_labels, (False, False))
+
+        def label(c) -> str:
+            nm = c.name if show_name else None
+            st = f"<<{c.stereotype}>>" if (show_stereo and c.stereotype) else None
+            if nm and st:
+                return f" : {nm} / {st}"
+            return f" : {nm or st}" if (nm or st) else ""
+
+        connector_lines = (
+            f"{refs[c.source.element_id]} --> {refs[c.target.element_id]}{label(c)}"
+            for c in conns
+        )
 
         # Notes
-        for n in diagram.notes:
-            out.writeln(f'note "{n.text}" as N{n.id}')
+        note_lines = (f'note "{n.text}" as N{n.id}' for n in diagram.notes)
+
+        return chain(header, element_lines, connector_lines, note_lines)
@@ -1,49 +1,38 @@
 from __future__ import annotations
-from typing import Dict
+from itertools import chain
+from typing import Iterable
 
 from ..handler_registry import register
 from ..models import Diagram, Element
-from ..renderer import PlantUMLWriter
 from ..utils import puml_escape_inline
+from ._common import _index, _refs, _valid_connectors
 
-def _index(diagram: Diagram) -> Dict[int, Element]:
-    return {e.id: e for e in diagram.elements}
-
-def _ref(el: Element, alias_mode: str) -> str:
-    if alias_mode == "name":
-        return f"\"{puml_escape_inline(el.name)}\""
-    return el.alias or f"\"{puml_escape_inline(el.name)}\""
+def _kind(el: Element) -> str:
+    is_actor = (el.stereotype or "").lower() == "actor" or el.type.lower() == "actor"
+    return "actor" if is_actor else "participant"
 
 @register("Sequence")
 class SequenceDiagramHandler:
     @staticmethod
-    def render(diagram: Diagram, out: PlantUMLWriter, cfg) -> None:
+    def render(diagram: Diagram, cfg) -> Iterable[str]:
+        alias_mode = cfg.alias_mode
         idx = _index(diagram)
+        conns = _valid_connectors(diagram, idx)
+        refs = _refs(idx, alias_mode, conns)
+        esc_names = {eid: puml_escape_inline(e.name) for eid, e in idx.items()}
 
         # Participants
-        for el in diagram.elements:
-            name = puml_escape_inline(el.name)
-            if (el.stereotype or "").lower() == "actor" or el.type.lower() == "actor":
-                if cfg.alias_mode == "name":
-                    out.writeln(f'actor "{name}"')
-                else:
-                    out.writeln(f'actor "{name}" as {el.alias}')
-            else:
-                if cfg.alias_mode == "name":
-                    out.writeln(f'participant "{name}"')
-                else:
-                    out.writeln(f'participant "{name}" as {el.alias}')
-        out.writeln("")
+        if alias_mode == "name":
+            participant_lines = (f'{_kind(el)} "{esc_names[el.id]}"' for el in diagram.elements)
+        else:
+            participant_lines = (f'{_kind(el)} "{esc_names[el.id]}" as {el.alias}' for el in diagram.elements)
 
         # Messages
-        for c in diagram.connectors:
-            src_el = idx.get(c.source.element_id)
-            dst_el = idx.get(c.target.element_id)
-            if not src_el or not dst_el:
-                continue
-            src = _ref(src_el, cfg.alias_mode)
-            dst = _ref(dst_el, cfg.alias_mode)
-            label = c.labels.get("name") or ""
-            # (If you distinguish sync/async by c.type in monolith, apply here.)
-            out.writeln(f"{src} -> {dst}" + (f" : {label}" if label else ""))
-        out.writeln("")
+        # (If you distinguish sync/async by c.type in monolith, apply here.)
+        message_lines = (
+            f"{refs[c.source.element_id]} -> {refs[c.target.element_id]}"
+            + (f" : {c.name}" if c.name else "")
+            for c in conns
+        )
+
+        return chain(participant_lines, ("",), message_lines, ("",))
@@ -1,37 +1,36 @@
 from __future__ import annotations
-from typing import Dict
+from itertools import chain
+from typing import Iterable
 
 from ..handler_registry import register
 from ..models import Diagram, Element
-from ..renderer import PlantUMLWriter
 from ..utils import puml_escape_inline
+from ._common import _index, _refs, _valid_connectors
 
-def _index(diagram: Diagram) -> Dict[int, Element]:
-    return {e.id: e for e in diagram.elements}
-
-def _ref(el: Element, alias_mode: str) -> str:
-    if alias_mode == "name":
-        return f"\"{puml_escape_inline(el.name)}\""
-    return el.alias or f"\"{puml_escape_inline(el.name)}\""
+def _kind(el: Element) -> str:
+    is_actor = (el.stereotype or "").lower() == "actor" or el.type.lower() == "actor"
+    return "actor" if is_actor else "usecase"
 
 @register("Use Case")
 class UseCaseDiagramHandler:
     @staticmethod
-    def render(diagram: Diagram, out: PlantUMLWriter, cfg) -> None:
-        for el in diagram.elements:
-            alias = f" as {el.alias}" if (el.alias and cfg.alias_mode != "name") else ""
-            if (el.stereotype or "").lower() == "actor" or el.type.lower() == "actor":
-                out.writeln(f'actor "{puml_escape_inline(el.name)}"{alias}')
-            else:
-                out.writeln(f'usecase "{puml_escape_inline(el.name)}"{alias}')
-
+    def render(diagram: Diagram, cfg) -> Iterable[str]:
+        alias_mode = cfg.alias_mode
         idx = _index(diagram)
-        for c in diagram.connectors:
-            src_el = idx.get(c.source.element_id)
-            dst_el = idx.get(c.target.element_id)
-            if not src_el or not dst_el:
-                continue
-            src = _ref(src_el, cfg.alias_mode)
-            dst = _ref(dst_el, cfg.alias_mode)
-            label = c.labels.get("name") or ""
-            out.writeln(f"{src} --> {dst}" + (f" : {label}" if label else ""))
+        conns = _valid_connectors(diagram, idx)
+        refs = _refs(idx, alias_mode, conns)
+        esc_names = {eid: puml_escape_inline(e.name) for eid, e in idx.items()}
+
+        as_alias = alias_mode != "name"
+        element_lines = (
+            f'{_kind(el)} "{esc_names[el.id]}"' + (f" as {el.alias}" if (as_alias and el.alias) else "")
+            for el in diagram.elements
+        )
+
+        connector_lines = (
+            f"{refs[c.source.element_id]} --> {refs[c.target.element_id]}"
+            + (f" : {c.name}" if c.name else "")
+            for c in conns
+        )
+
+        return chain(element_lines, connector_lines)
@@ -5,12 +5,21 @@ from pathlib import Path
 
 from .config import Config
 from .ea_adapter import EAAdapter
-from .handler_registry import resolve
-from .handlers import component, sequence, usecase  # noqa: F401
+from .handler_registry import register_lazy, resolve
 from .renderer import PlantUMLWriter
 
 _SANITIZE = re.compile(r"[^A-Za-z0-9._-]+")
 
+# EA diagram type -> handler module (relative to this package); each is
+# imported on first use only
+_HANDLER_MODULES = {
+    "Component": ".handlers.component",
+    "Sequence": ".handlers.sequence",
+    "Use Case": ".handlers.usecase",
+}
+for _diagram_type, _module in _HANDLER_MODULES.items():
+    register_lazy(_diagram_type, f"{__package__}{_module}")
+
 def _sanitize_filename(name: str) -> str:
     name = name.strip()
     name = _SANITIZE.sub("_", name)
@@ -27,7 +36,7 @@ def run(cfg: Config) -> Path:
 
     out = PlantUMLWriter(skin=cfg.skin, autolayout=cfg.autolayout)
     out.start(diagram.name)
-    Handler.render(diagram, out, cfg)
+    out.extend(Handler.render(diagram, cfg))
     out.end()
 
     fname = cfg.filename or _sanitize_filename(diagram.name)
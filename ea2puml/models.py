@@ -1,17 +1,22 @@
 from __future__ import annotations
+import sys
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Dict, List, NamedTuple, Optional
 
 Id = int  # EA model ElementID
 
-@dataclass
-class Geometry:
+# Models are created per diagram object/link: slots drop the per-instance
+# __dict__ (smaller objects, faster attribute reads). dataclass(slots=...)
+# is 3.10+; older interpreters get plain dataclasses with the same fields.
+_model = dataclass(slots=True) if sys.version_info >= (3, 10) else dataclass
+
+class Geometry(NamedTuple):
     left: int
     right: int
     top: int
     bottom: int
 
-@dataclass
+@_model
 class Element:
     id: Id                  # EA model ElementID
     guid: str               # DiagramObject.InstanceGUID (for stable aliasing)
@@ -23,20 +28,20 @@ class Element:
     geometry: Optional[Geometry] = None
     alias: Optional[str] = None   # computed per alias mode ("" when alias_mode=name)
 
-@dataclass
+@_model
 class Note:
     id: Id
     text: str
     geometry: Optional[Geometry] = None
     tags: Dict[str, str] = field(default_factory=dict)
 
-@dataclass
+@_model
 class ConnectorEnd:
     element_id: Id
     role: Optional[str] = None
     label: Optional[str] = None
 
-@dataclass
+@_model
 class Connector:
     id: Id
     type: str
@@ -44,10 +49,17 @@ class Connector:
     color: Optional[str]
     source: ConnectorEnd
     target: ConnectorEnd
-    labels: Dict[str, str] = field(default_factory=dict)
+    name: str = ""
+    labels: Optional[Dict[str, str]] = None  # extra labels only; created by add_label()
     geometry: Optional[Geometry] = None
 
-@dataclass
+    def add_label(self, key: str, value: str) -> None:
+        # most connectors carry only `name`: the dict exists only once needed
+        if self.labels is None:
+            self.labels = {}
+        self.labels[key] = value
+
+@_model
 class Diagram:
     id: Id
     name: str
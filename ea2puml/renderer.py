@@ -1,6 +1,8 @@
 from __future__ import annotations
 from pathlib import Path
-from typing import Optional, Iterable
+from typing import BinaryIO, Iterator, Optional, Iterable
+
+_BATCH_LINES = 4096  # lines joined per chunk when streaming the document out
 
 
 class PlantUMLWriter:
@@ -43,9 +45,24 @@ class PlantUMLWriter:
     def text(self) -> str:
         return "\n".join(self._buf) + ("\n" if self._buf and not self._buf[-1].endswith("\n") else "")
 
+    def _chunks(self) -> Iterator[str]:
+        """`text()` in pieces of at most _BATCH_LINES lines; never the whole document at once."""
+        buf = self._buf
+        last = len(buf) - _BATCH_LINES
+        for i in range(0, len(buf), _BATCH_LINES):
+            chunk = "\n".join(buf[i:i + _BATCH_LINES])
+            # a last line that already ends with "\n" gets no extra terminator
+            yield chunk if i >= last and buf[-1].endswith("\n") else chunk + "\n"
+
+    def write_to(self, stream: BinaryIO) -> None:
+        """Write the UTF-8 document to any binary stream (file, BytesIO, socket file)."""
+        for chunk in self._chunks():
+            stream.write(chunk.encode("utf-8"))
+
     def save(self, outdir: Path, filename: str) -> Path:
         outdir.mkdir(parents=True, exist_ok=True)
         path = outdir / f"{filename}.puml"
-        with path.open("w", encoding="utf-8") as f:
-            f.write(self.text())
+        # binary mode: encoded batches, no text-layer newline translation
+        with path.open("wb") as f:
+            self.write_to(f)
         return path
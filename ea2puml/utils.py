@@ -1,23 +1,37 @@
 # ea2puml/utils.py
 from __future__ import annotations
-import os, re
-from typing import Dict
+import functools
+import itertools
+import re
+from collections import Counter
 
+_ESC_TABLE = str.maketrans({"\\": "\\\\", '"': '\\"'})
+_SLUG_RE = re.compile(r"[^A-Za-z0-9_]+")
+_ALIAS_STRIP_RE = re.compile(r"[^A-Za-z0-9]")
+_ANON_IDS = itertools.count(1)  # unique suffixes for GUID-less objects (per run)
+
+@functools.lru_cache(maxsize=4096)
 def puml_escape_inline(text: str) -> str:
-    if text is None:
-        return ""
-    return str(text).replace("\\", "\\\\").replace('"', r"\"")
+    # single C-level pass; cached since names repeat across participants/messages
+    return "" if text is None else str(text).translate(_ESC_TABLE)
 
 def sanitize_alias(guid: str) -> str:
     if not guid:
-        return "E_" + str(abs(hash(os.urandom(4))))
-    g = re.sub(r"[^A-Za-z0-9]", "", guid)
+        return f"E_anon_{next(_ANON_IDS)}"
+    return _alias_from_guid(guid)
+
+@functools.lru_cache(maxsize=4096)
+def _alias_from_guid(guid: str) -> str:
+    # pure in `guid`, so cached (regenerating a diagram repeats every GUID);
+    # the empty-GUID path above must stay uncached to keep aliases unique
+    g = _ALIAS_STRIP_RE.sub("", guid)
     if not g:
         g = "E" + str(abs(hash(guid)) % (10**8))
     return "E_" + g[:16]
 
+@functools.lru_cache(maxsize=2048)
 def slugify_name(name: str) -> str:
-    s = re.sub(r"[^A-Za-z0-9_]+", "_", (name or "").strip())
+    s = _SLUG_RE.sub("_", (name or "").strip())
     if not s or s[0].isdigit():
         s = "E_" + s
     return s[:40] if len(s) > 40 else s
@@ -26,13 +40,13 @@ class AliasFactory:
     """Matches the monolith behavior: uuid | human | name."""
     def __init__(self, mode: str):
         self.mode = mode
-        self.counts: Dict[str, int] = {}
+        self.counts: Counter[str] = Counter()
     def make(self, instance_guid: str, name: str) -> str:
         if self.mode == "uuid":
             return sanitize_alias(instance_guid)
         if self.mode == "human":
             base = slugify_name(name) or "E"
-            n = self.counts.get(base, 0)
+            n = self.counts[base]
             self.counts[base] = n + 1
             return base if n == 0 else f"{base}_{n+1}"
         return ""  # name mode → no alias (use quoted name everywhere)
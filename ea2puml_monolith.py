@@ -16,27 +16,37 @@
 # ============================================================
 
 import argparse
+import functools
+import itertools
 import os
 import re
-from typing import Dict, Tuple, Optional, List
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Tuple, Optional, List
 
 try:
-    import win32com.client.dynamic  # pywin32
+    import win32com.client  # pywin32
 except Exception:
     print("ERROR: pywin32 is required. Install with: pip install pywin32")
     raise
 
 # ---------------- Helpers ----------------
 
+_SLUG_RE = re.compile(r"[^A-Za-z0-9_]+")
+_ALIAS_RE = re.compile(r"[^A-Za-z0-9]")
+_FNAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+_ANON_IDS = itertools.count(1)  # unique suffixes for GUID-less objects (per run)
+
+@functools.lru_cache(maxsize=8192)
 def puml_escape_inline(text: str) -> str:
+    # names/stereotypes repeat across elements and edges; escape each once
     if text is None:
         return ""
     return str(text).replace("\\", "\\\\").replace('"', r'\"')
 
 def sanitize_alias(guid: str) -> str:
     if not guid:
-        return "E_" + str(abs(hash(os.urandom(4))))
-    g = re.sub(r"[^A-Za-z0-9]", "", guid)
+        return f"E_anon_{next(_ANON_IDS)}"
+    g = _ALIAS_RE.sub("", guid)
     if not g:
         g = "E" + str(abs(hash(guid)) % (10**8))
     return "E_" + g[:16]
@@ -44,13 +54,11 @@ def sanitize_alias(guid: str) -> str:
 def ea_color_long_to_hex(ea_long: int) -> Optional[str]:
     if ea_long is None or ea_long == -1:
         return None
-    hx = hex(ea_long).replace("0x", "")
-    hx = ("0" * (6 - len(hx))) + hx[-6:]
-    b, g, r = hx[0:2], hx[2:4], hx[4:6]
-    return f"#{r}{g}{b}".upper()
+    # EA stores colors as 0x00BBGGRR
+    return "#%02X%02X%02X" % (ea_long & 0xFF, (ea_long >> 8) & 0xFF, (ea_long >> 16) & 0xFF)
 
 def slugify_name(name: str) -> str:
-    s = re.sub(r"[^A-Za-z0-9_]+", "_", (name or "").strip())
+    s = _SLUG_RE.sub("_", (name or "").strip())
     if not s or s[0].isdigit():
         s = "E_" + s
     return s[:40] if len(s) > 40 else s
@@ -69,6 +77,37 @@ class AliasFactory:
             return base if n == 0 else f"{base}_{n+1}"
         return ""  # name mode → no alias
 
+class RectIndex:
+    """Interval index over rect x-extents (bbox prefilter before exact geometry tests).
+
+    Rects flagged `wide` (packages, the widest boxes on a diagram) are kept out of
+    the sorted index and checked linearly, so they don't widen every query window.
+    """
+    def __init__(self, rects: List[dict], wide: Iterable[int] = ()):
+        self.rects = rects
+        # zero-area rects pass the ">= 50% overlap" test against any package
+        self.always = [i for i, r in enumerate(rects) if r["w"] <= 0 or r["h"] <= 0]
+        skip = set(self.always)
+        self.wide = [i for i in sorted(set(wide)) if i not in skip]
+        skip.update(self.wide)
+        narrow = [i for i in range(len(rects)) if i not in skip]
+        self.order = sorted(narrow, key=lambda i: rects[i]["x"])
+        self.xs = [rects[i]["x"] for i in self.order]
+        self.max_w = max((rects[i]["w"] for i in narrow), default=0)
+
+    def intersection(self, rect: dict) -> List[int]:
+        """Indices (unordered) of rects whose x-extent touches `rect`."""
+        rects = self.rects
+        x1 = rect["x"]
+        x2 = x1 + rect["w"]
+        lo = bisect_left(self.xs, x1 - self.max_w)
+        hi = bisect_right(self.xs, x2)
+        hits = [i for i in self.order[lo:hi] if rects[i]["x"] + rects[i]["w"] >= x1]
+        hits.extend(i for i in self.wide
+                    if rects[i]["x"] <= x2 and rects[i]["x"] + rects[i]["w"] >= x1)
+        hits.extend(self.always)
+        return hits
+
 # ---------------- Mappings ----------------
 
 ELEMENT_TYPE_TO_PUML = {
@@ -91,25 +130,34 @@ ELEMENT_TYPE_TO_PUML = {
     "Environment": "frame",
 }
 
+# lowercased EA connector type -> (line style, arrow head)
+CONNECTOR_TYPE_TO_REL: Dict[str, Tuple[str, str]] = {
+    "association": ("--", ">"),
+    "dependency": ("..", ">"),
+    "realization": ("..", "|>"),
+    "realisation": ("..", "|>"),
+    "generalization": ("--", "|>"),
+    "inheritance": ("--", "|>"),
+    "aggregation": ("o-", ">"),
+    "composition": ("*-", ">"),
+    "informationflow": ("..", ">"),
+    "information flow": ("..", ">"),
+    "controlflow": ("-", "->"),
+    "control flow": ("-", "->"),
+    "flow": ("-", "->"),
+}
+
+# arrow prefix -> colored replacement (first match wins; "-" must stay last)
+REL_COLOR_TEMPLATES: List[Tuple[str, str]] = [
+    ("--", "-[{c}]-"),
+    ("..", ".[{c}]."),
+    ("*-", "*[{c}]-"),
+    ("o-", "o[{c}]-"),
+    ("-", "-[{c}]"),
+]
+
 def relation_for_type(conn_type: str) -> Tuple[str, str]:
-    t = (conn_type or "").lower()
-    if t in ("association",):
-        return ("--", ">")
-    if t in ("dependency",):
-        return ("..", ">")
-    if t in ("realization", "realisation"):
-        return ("..", "|>")
-    if t in ("generalization", "inheritance"):
-        return ("--", "|>")
-    if t in ("aggregation",):
-        return ("o-", ">")
-    if t in ("composition",):
-        return ("*-", ">")
-    if t in ("informationflow", "information flow"):
-        return ("..", ">")
-    if t in ("controlflow", "control flow", "flow"):
-        return ("-", "->")
-    return ("--", ">")
+    return CONNECTOR_TYPE_TO_REL.get((conn_type or "").lower(), ("--", ">"))
 
 # ---------------- Exporter ----------------
 
@@ -142,7 +190,8 @@ class EAPlantUMLExporter:
         self.repo = None
 
         # Collected data
-        self.elements: Dict[str, dict] = {}     # by DiagramObject.InstanceGUID
+        self._elements_list: List[dict] = []    # in diagram order
+        self._idx_by_guid: Dict[str, int] = {}  # DiagramObject.InstanceGUID -> list index
         self.connectors: Dict[str, dict] = {}   # by DiagramLink.ConnectorID
         self.alias_by_guid: Dict[str, str] = {}
         self.packages: Dict[str, dict] = {}     # pkg rect + color
@@ -152,7 +201,12 @@ class EAPlantUMLExporter:
     # -------- COM ----------
     def connect_ea(self):
         print("Connecting to Enterprise Architect (EA)...")
-        self.eapp = win32com.client.dynamic.Dispatch("EA.App")
+        try:
+            # early binding: makepy wrappers from EA's type library (generated on first run)
+            self.eapp = win32com.client.gencache.EnsureDispatch("EA.App")
+        except Exception:
+            # type library unavailable (or gen_py cache not writable) -> late binding
+            self.eapp = win32com.client.dynamic.Dispatch("EA.App")
         self.repo = self.eapp.Repository
         print("Connected to EA repository.")
 
@@ -164,11 +218,11 @@ class EAPlantUMLExporter:
 
     # -------- Geometry helpers ----------
     @staticmethod
-    def rect(dobj, cornerX=0, cornerY=0):
-        x = dobj.Left + cornerX
-        y = -dobj.Top + cornerY
-        w = dobj.Right - dobj.Left
-        h = -(dobj.Bottom - dobj.Top)
+    def rect(left: int, top: int, right: int, bottom: int, cornerX=0, cornerY=0):
+        x = left + cornerX
+        y = -top + cornerY
+        w = right - left
+        h = -(bottom - top)
         return {"x": x, "y": y, "w": w, "h": h}
 
     @staticmethod
@@ -197,110 +251,186 @@ class EAPlantUMLExporter:
                 cx <= outer_rect["x"] + outer_rect["w"] and
                 cy <= outer_rect["y"] + outer_rect["h"])
 
+    @staticmethod
+    def bounds(rect: dict) -> Tuple[int, int, int, int, int, int, int]:
+        """Flatten a rect once into (x1, y1, x2, y2, cx, cy, area) for tight loops."""
+        x, y, w, h = rect["x"], rect["y"], rect["w"], rect["h"]
+        return (x, y, x + w, y + h, x + w // 2, y + h // 2, max(0, w) * max(0, h))
+
+    def element(self, guid: str) -> Optional[dict]:
+        """Collected element for a diagram InstanceUID, or None."""
+        pos = self._idx_by_guid.get(guid)
+        return None if pos is None else self._elements_list[pos]
+
     # -------- Endpoint resolution ----------
-    def resolve_endpoint_uid(self, dlnk, dconn, which: str) -> Optional[str]:
-        """Return a diagram InstanceUID for connector endpoint ('source' or 'target')."""
-        uid = dlnk.SourceInstanceUID if which == "source" else dlnk.TargetInstanceUID
-        if uid and uid in self.elements:
+    def _uid_src(self, dlnk, dconn) -> Optional[str]:
+        """Diagram InstanceUID of the connector's source (ClientID fallback)."""
+        uid = dlnk.SourceInstanceUID
+        if uid and uid in self._idx_by_guid:
             return uid
-        elem_id = int(dconn.ClientID) if which == "source" else int(dconn.SupplierID)
-        return self.elemid_to_instuid.get(elem_id)
+        return self.elemid_to_instuid.get(int(dconn.ClientID))
+
+    def _uid_tgt(self, dlnk, dconn) -> Optional[str]:
+        """Diagram InstanceUID of the connector's target (SupplierID fallback)."""
+        uid = dlnk.TargetInstanceUID
+        if uid and uid in self._idx_by_guid:
+            return uid
+        return self.elemid_to_instuid.get(int(dconn.SupplierID))
 
     # -------- Gather ----------
-    def gather(self, diagram, cornerX=0, cornerY=0):
-        # First pass: collect elements with geometry
-        for dObj in diagram.DiagramObjects:
-            dElem = self.repo.GetElementByID(dObj.ElementID)
+    def gather(self, root_diagram):
+        # First pass: collect elements with geometry. Embedded UMLDiagram objects
+        # are walked in place with an explicit stack (same order as recursion);
+        # each diagram is recorded in `walked` once all its objects are seen.
+        # A frame whose diagram is already on the stack or already walked (cycles,
+        # self-embedding, repeated frames) is kept as an element but not expanded.
+        walked = []
+        seen = {root_diagram.DiagramID}
+        stack = [(root_diagram, iter(root_diagram.DiagramObjects), 0, 0)]
+        while stack:
+            diagram, objs, cornerX, cornerY = stack[-1]
+            dObj = next(objs, None)
+            if dObj is None:
+                stack.pop()
+                walked.append(diagram)
+                continue
+
+            # read each COM property once; every access is a cross-process call
+            elem_id = int(dObj.ElementID)
             inst_guid = dObj.InstanceGUID
+            left, top, right, bottom = dObj.Left, dObj.Top, dObj.Right, dObj.Bottom
+            bg_raw = getattr(dObj, "BackgroundColor", -1) if self.include_colors else -1
+            show_tags = bool(getattr(dObj, "ShowTags", False))
+            dElem = self.repo.GetElementByID(elem_id)
+            name = dElem.Name or ""
+            etype = dElem.Type or ""
+            stereo = dElem.Stereotype or ""
+            notes = dElem.Notes or ""
+
             # index model ElementID -> this diagram InstanceUID (first seen)
-            self.elemid_to_instuid.setdefault(int(dObj.ElementID), inst_guid)
-            alias = self.alias_factory.make(inst_guid, dElem.Name or "")
+            self.elemid_to_instuid.setdefault(elem_id, inst_guid)
+            alias = self.alias_factory.make(inst_guid, name)
             self.alias_by_guid[inst_guid] = alias
 
-            rect = self.rect(dObj, cornerX, cornerY)
-            bg = ea_color_long_to_hex(getattr(dObj, "BackgroundColor", -1)) if self.include_colors else None
+            rect = self.rect(left, top, right, bottom, cornerX, cornerY)
+            bg = ea_color_long_to_hex(bg_raw) if self.include_colors else None
 
             el = {
                 "guid": inst_guid,
                 "alias": alias,
-                "name": dElem.Name or "",
-                "type": dElem.Type or "",
-                "stereotype": dElem.Stereotype or "",
-                "notes": dElem.Notes or "",
-                "show_tags": bool(getattr(dObj, "ShowTags", False)),
+                "name": name,
+                "type": etype,
+                "stereotype": stereo,
+                "notes": notes,
+                "show_tags": show_tags,
                 "bg_hex": bg,
                 "raw": dElem,
                 "dobj": dObj,
                 "rect": rect,
+                # PlantUML reference token, computed once for every renderer
+                "ref": f'"{puml_escape_inline(name)}"' if self.alias_mode == "name" else alias,
             }
-            self.elements[inst_guid] = el
+            pos = self._idx_by_guid.get(inst_guid)
+            if pos is None:
+                self._idx_by_guid[inst_guid] = len(self._elements_list)
+                self._elements_list.append(el)
+            else:
+                self._elements_list[pos] = el
 
-            if el["type"] == "Package":
+            if etype == "Package":
                 self.packages[inst_guid] = {
                     "guid": inst_guid,
-                    "name": el["name"],
+                    "name": name,
                     "alias": alias,
                     "color": bg,
                     "rect": rect,
                 }
 
             if self.explore:
-                print(f"ELEMENT: {el['type']} '{el['name']}' alias={alias or '(name)'} bg={bg} rect={rect}")
+                print(f"ELEMENT: {etype} '{name}' alias={alias or '(name)'} bg={bg} rect={rect}")
 
-            if el["type"] == "UMLDiagram":
+            if etype == "UMLDiagram":
                 diagID = dElem.MiscData(0)
                 sub = self.repo.GetDiagramByID(diagID)
-                self.gather(sub, dObj.Left, -dObj.Top)
+                sub_id = sub.DiagramID
+                if sub_id not in seen:
+                    seen.add(sub_id)
+                    stack.append((sub, iter(sub.DiagramObjects), left, -top))
 
         # Second pass: geometry-based package membership
-        for pkg_guid, pkg in self.packages.items():
-            members: List[str] = []
-            preg = pkg["rect"]
-            for guid, el in self.elements.items():
+        # (filter candidates through the x-extent index, then refine exactly)
+        guids = [el["guid"] for el in self._elements_list]
+        rects = [el["rect"] for el in self._elements_list]
+        boxes = [self.bounds(r) for r in rects]
+        packages = self.packages
+        index = RectIndex(rects, wide=[i for i, g in enumerate(guids) if g in packages])
+        for pkg_guid, pkg in packages.items():
+            members: List[int] = []
+            px1, py1, px2, py2 = self.bounds(pkg["rect"])[:4]
+            for i in index.intersection(pkg["rect"]):
+                guid = guids[i]
                 if guid == pkg_guid:
                     continue
-                erect = el["rect"]
+                x1, y1, x2, y2, cx, cy, area = boxes[i]
+                # y-separated from the package (x was filtered by the index);
+                # zero-area rects must still reach the overlap test below
+                if area and (y2 < py1 or y1 > py2):
+                    continue
                 # center-in-rect OR overlap >= 50% of element area
-                ov = self.overlap_area(erect, preg)
-                inside = self.center_inside(erect, preg) or (ov >= 0.5 * self.area(erect))
-                if inside:
-                    members.append(guid)
-            self.members_in_pkg[pkg_guid] = members
-
-        # Connectors
-        for dLnk in diagram.DiagramLinks:
-            if dLnk.IsHidden:
-                continue
-            dConn = self.repo.GetConnectorByID(dLnk.ConnectorID)
+                if px1 <= cx <= px2 and py1 <= cy <= py2:
+                    members.append(i)
+                    continue
+                iw = min(x2, px2) - max(x1, px1)
+                ih = min(y2, py2) - max(y1, py1)
+                ov = iw * ih if iw > 0 and ih > 0 else 0
+                if ov * 2 >= area:
+                    members.append(i)
+            # back to element insertion order (only the hits get sorted)
+            members.sort()
+            self.members_in_pkg[pkg_guid] = [guids[i] for i in members]
+
+        # Connectors (every walked diagram, innermost first)
+        for diagram in walked:
+            for dLnk in diagram.DiagramLinks:
+                if dLnk.IsHidden:
+                    continue
+                conn_id = dLnk.ConnectorID
+                dConn = self.repo.GetConnectorByID(conn_id)
 
-            source_uid = self.resolve_endpoint_uid(dLnk, dConn, "source")
-            target_uid = self.resolve_endpoint_uid(dLnk, dConn, "target")
-            if not source_uid or not target_uid:
-                # endpoint not on this diagram (or hidden) -> skip
-                continue
+                source_uid = self._uid_src(dLnk, dConn)
+                target_uid = self._uid_tgt(dLnk, dConn)
+                if not source_uid or not target_uid:
+                    # endpoint not on this diagram (or hidden) -> skip
+                    continue
 
-            conn = {
-                "id": str(dLnk.ConnectorID),
-                "name": dConn.Name or "",
-                "type": dConn.Type or "",
-                "stereotype": dConn.Stereotype or "",
-                "direction": dConn.Direction or "Unspecified",
-                "source_uid": source_uid,
-                "target_uid": target_uid,
-                "line_hex": ea_color_long_to_hex(getattr(dLnk, "LineColor", -1)) if self.include_colors else None,
-                "line_width": getattr(dLnk, "LineWidth", 1),
-                "hidden_labels": bool(getattr(dLnk, "HiddenLabels", False)),
-                "raw": dConn,
-                "dlnk": dLnk,
-            }
-            self.connectors[conn["id"]] = conn
+                # pull every COM property once, only for connectors we keep
+                cname, ctype, cstereo, cdir = dConn.Name, dConn.Type, dConn.Stereotype, dConn.Direction
+                line_raw = getattr(dLnk, "LineColor", -1) if self.include_colors else -1
+                line_w = getattr(dLnk, "LineWidth", 1)
+                hlabs = getattr(dLnk, "HiddenLabels", False)
+
+                conn = {
+                    "id": str(conn_id),
+                    "name": cname or "",
+                    "type": ctype or "",
+                    "stereotype": cstereo or "",
+                    "direction": cdir or "Unspecified",
+                    "source_uid": source_uid,
+                    "target_uid": target_uid,
+                    "line_hex": ea_color_long_to_hex(line_raw) if self.include_colors else None,
+                    "line_width": line_w,
+                    "hidden_labels": bool(hlabs),
+                    "raw": dConn,
+                    "dlnk": dLnk,
+                }
+                self.connectors[conn["id"]] = conn
 
-            if self.explore:
-                print(f"CONNECTOR: {conn['type']} '{conn['name']}' <<{conn['stereotype']}>> "
-                      f"{conn['source_uid']} -> {conn['target_uid']} dir={conn['direction']} color={conn['line_hex']}")
+                if self.explore:
+                    print(f"CONNECTOR: {conn['type']} '{conn['name']}' <<{conn['stereotype']}>> "
+                          f"{conn['source_uid']} -> {conn['target_uid']} dir={conn['direction']} color={conn['line_hex']}")
 
     # -------- Render ----------
-    def render_header(self, diagram) -> str:
+    def render_header(self, diagram) -> List[str]:
         lines = []
         lines.append("@startuml")
         lines.append(f'title "{puml_escape_inline(diagram.Name)}"')
@@ -322,17 +452,12 @@ class EAPlantUMLExporter:
             lines.append("")
             lines.append("autolayout")
         lines.append("")
-        return "\n".join(lines)
+        return lines
 
-    def render_footer(self) -> str:
-        return "\n@enduml\n"
+    def render_footer(self) -> List[str]:
+        return ["", "@enduml", ""]
 
-    def ref_token(self, el: dict) -> str:
-        if self.alias_mode == "name":
-            return f"\"{puml_escape_inline(el['name'])}\""
-        return el["alias"]
-
-    def element_decl(self, el: dict) -> str:
+    def element_decl(self, el: dict) -> List[str]:
         name = el["name"] or ""
         st = el["stereotype"] or ""
         etype = el["type"] or ""
@@ -347,7 +472,7 @@ class EAPlantUMLExporter:
             if txt:
                 lines.extend(txt.splitlines())
             lines.append("end note")
-            return "\n".join(lines)
+            return lines
 
         # Element stereotypes
         name_disp = name
@@ -363,25 +488,26 @@ class EAPlantUMLExporter:
         # Interface style (lollipop)
         if etype == "Interface" and self.interface_style == "lollipop":
             if self.alias_mode == "name":
-                return f'() {disp}{color}'
+                return [f'() {disp}{color}']
             else:
-                return f'() {disp} as {alias}{color}'
+                return [f'() {disp} as {alias}{color}']
 
         # Default element
         if self.alias_mode == "name":
-            return f'{keyword}{stereo_suffix} {disp}{color}'
+            return [f'{keyword}{stereo_suffix} {disp}{color}']
         else:
-            return f'{keyword}{stereo_suffix} {disp} as {alias}{color}'
+            return [f'{keyword}{stereo_suffix} {disp} as {alias}{color}']
 
-    def tag_block_for_element(self, el: dict) -> Optional[str]:
+    def tag_block_for_element(self, el: dict) -> Optional[List[str]]:
+        # checked first so no COM call is made when tags are not wanted
+        if not (self.include_tags or el.get("show_tags")):
+            return None
         try:
             tvs = el["raw"].TaggedValues
         except Exception:
             return None
         if not tvs or tvs.Count == 0:
             return None
-        if not (self.include_tags or el.get("show_tags")):
-            return None
 
         lines = []
         for tv in tvs:
@@ -396,10 +522,10 @@ class EAPlantUMLExporter:
         if not lines:
             return None
 
-        ref = self.ref_token(el)
-        return f"note right of {ref}\n" + "\n".join(lines) + "\nend note"
+        ref = el["ref"]
+        return [f"note right of {ref}", *lines, "end note"]
 
-    def render_elements_grouped(self) -> str:
+    def render_elements_grouped(self) -> List[str]:
         """Emit packages (ordered TL->BR) with members inside; then leftovers."""
         emitted: set = set()
         out: List[str] = []
@@ -419,40 +545,40 @@ class EAPlantUMLExporter:
             out.append(hdr)
 
             for guid in self.members_in_pkg.get(pkg["guid"], []):
-                el = self.elements[guid]
+                el = self._elements_list[self._idx_by_guid[guid]]
                 if el["type"] == "Package":
                     continue
-                out.append(self.element_decl(el))
+                out.extend(self.element_decl(el))
                 tagb = self.tag_block_for_element(el)
                 if tagb:
-                    out.append(tagb)
+                    out.extend(tagb)
                 emitted.add(guid)
 
             out.append("}")
             out.append("")
 
         # leftovers (not contained by any package region)
-        for guid, el in self.elements.items():
-            if el["type"] == "Package" or guid in emitted:
+        for el in self._elements_list:
+            if el["type"] == "Package" or el["guid"] in emitted:
                 continue
-            out.append(self.element_decl(el))
+            out.extend(self.element_decl(el))
             tagb = self.tag_block_for_element(el)
             if tagb:
-                out.append(tagb)
+                out.extend(tagb)
 
         out.append("")
-        return "\n".join(out)
+        return out
 
-    def render_connectors(self) -> str:
-        out = []
-        for cid, c in self.connectors.items():
-            src_el = self.elements.get(c["source_uid"])
-            dst_el = self.elements.get(c["target_uid"])
+    def render_connectors(self) -> List[str]:
+        out: List[str] = []
+        for c in self.connectors.values():
+            src_el = self.element(c["source_uid"])
+            dst_el = self.element(c["target_uid"])
             if not src_el or not dst_el:
                 continue
 
-            src = self.ref_token(src_el)
-            dst = self.ref_token(dst_el)
+            src = src_el["ref"]
+            dst = dst_el["ref"]
 
             style, head = relation_for_type(c["type"])
             if head == "|>":
@@ -466,16 +592,10 @@ class EAPlantUMLExporter:
                     rel = style + "-"
 
             if self.include_colors and c.get("line_hex"):
-                if rel.startswith("--"):
-                    rel = f'-[{c["line_hex"]}]-' + rel[2:]
-                elif rel.startswith(".."):
-                    rel = f'.[{c["line_hex"]}].' + rel[2:]
-                elif rel.startswith("*-"):
-                    rel = f'*[{c["line_hex"]}]-' + rel[2:]
-                elif rel.startswith("o-"):
-                    rel = f'o[{c["line_hex"]}]-' + rel[2:]
-                elif rel.startswith("-"):
-                    rel = f'-[{c["line_hex"]}]' + rel[1:]
+                for prefix, tmpl in REL_COLOR_TEMPLATES:
+                    if rel.startswith(prefix):
+                        rel = tmpl.format(c=c["line_hex"]) + rel[len(prefix):]
+                        break
 
             parts = []
             if self.edge_labels in ("name", "both") and (not c["hidden_labels"]) and c["name"]:
@@ -486,7 +606,7 @@ class EAPlantUMLExporter:
 
             out.append(f"{src} {rel} {dst}{label}")
         out.append("")
-        return "\n".join(out)
+        return out
 
     # -------- Sequence (basic) --------
     def is_sequence_diagram(self, diagram) -> bool:
@@ -495,12 +615,12 @@ class EAPlantUMLExporter:
         except Exception:
             return False
 
-    def render_sequence(self, diagram) -> str:
-        out = []
-        for guid, el in self.elements.items():
+    def render_sequence(self, diagram) -> List[str]:
+        out: List[str] = []
+        for el in self._elements_list:
             et = (el["type"] or "").lower()
             name = puml_escape_inline(el["name"])
-            ref = self.ref_token(el)
+            ref = el["ref"]
             if et in ("actor",):
                 if self.alias_mode == "name":
                     out.append(f'actor "{name}"')
@@ -512,15 +632,15 @@ class EAPlantUMLExporter:
                 else:
                     out.append(f'participant "{name}" as {ref}')
         out.append("")
-        for cid, c in self.connectors.items():
-            src_el = self.elements.get(c["source_uid"])
-            dst_el = self.elements.get(c["target_uid"])
+        for c in self.connectors.values():
+            src_el = self.element(c["source_uid"])
+            dst_el = self.element(c["target_uid"])
             if not src_el or not dst_el:
                 continue
             t = (c["type"] or "").lower()
             if t in ("message", "sequence"):
-                src = self.ref_token(src_el)
-                dst = self.ref_token(dst_el)
+                src = src_el["ref"]
+                dst = dst_el["ref"]
                 parts = []
                 if self.edge_labels in ("name", "both") and c["name"]:
                     parts.append(c["name"])
@@ -529,28 +649,33 @@ class EAPlantUMLExporter:
                 label = " : " + " ".join(parts) if parts else ""
                 out.append(f"{src} -> {dst}{label}")
         out.append("")
-        return "\n".join(out)
+        return out
 
     # -------- Main --------
+    def iter_sections(self, diagram):
+        """Yield the document as line lists; sections are separated by one newline."""
+        yield self.render_header(diagram)
+        if self.is_sequence_diagram(diagram):
+            yield self.render_sequence(diagram)
+        else:
+            yield self.render_elements_grouped()
+            yield self.render_connectors()
+        yield self.render_footer()
+
     def export(self, outdir: str, filename: Optional[str] = None):
         self.connect_ea()
         diagram = self.get_selected_diagram()
         self.gather(diagram)
 
-        lines = [self.render_header(diagram)]
-        if self.is_sequence_diagram(diagram):
-            lines.append(self.render_sequence(diagram))
-        else:
-            lines.append(self.render_elements_grouped())
-            lines.append(self.render_connectors())
-        lines.append(self.render_footer())
-
-        puml = "\n".join(lines)
-        base = re.sub(r"[^A-Za-z0-9._-]+", "_", filename or (diagram.Name or "diagram"))
+        base = _FNAME_RE.sub("_", filename or (diagram.Name or "diagram"))
         os.makedirs(outdir, exist_ok=True)
         path = os.path.join(outdir, base + ".puml")
+        # stream section by section instead of joining the whole document first
         with open(path, "w", encoding="utf-8") as f:
-            f.write(puml)
+            for i, section in enumerate(self.iter_sections(diagram)):
+                if i:
+                    f.write("\n")
+                f.write("\n".join(section))
         print(f"Exported PlantUML to: {path}")
 
 # ---------------- CLI ----------------